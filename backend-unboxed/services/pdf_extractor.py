@@ -5,61 +5,36 @@ Extracts actual text from PDF files - no mock data!
 """
 import sys
 import json
-import fitz  # PyMuPDF
-from pathlib import Path
+import pdf_text
 
-def extract_pdf_text(pdf_path):
-    """Extract text from PDF using PyMuPDF"""
-    try:
-        # Verify file exists
-        if not Path(pdf_path).exists():
-            return {
-                "success": False,
-                "error": f"File not found: {pdf_path}",
-                "text": "",
-                "metadata": {}
-            }
-        
-        # Open PDF
-        doc = fitz.open(pdf_path)
-        
-        # Extract text from all pages
-        full_text = ""
-        page_texts = []
-        
-        for page_num in range(doc.page_count):
-            page = doc.load_page(page_num)
-            page_text = page.get_text()
-            page_texts.append(page_text)
-            full_text += page_text + "\n"
-        
-        # Get file stats
-        file_size = Path(pdf_path).stat().st_size
-        
-        # Prepare result
-        result = {
-            "success": True,
-            "text": full_text.strip(),
-            "totalCharacters": len(full_text.strip()),
-            "metadata": {
-                "pageCount": doc.page_count,
-                "fileSize": file_size,
-                "extractionMethod": "PyMuPDF-Python",
-                "extractionTime": "",  # Will be set by Node.js
-                "pages": page_texts
-            }
-        }
-        
-        doc.close()
-        return result
-        
-    except Exception as e:
+def extract_pdf_text(pdf_path, max_pages=None):
+    """Extract text from PDF using PyMuPDF, optionally only the first max_pages pages"""
+    result = pdf_text.extract_text_from_pdf(pdf_path, mode="fast", keep_pages=True, max_pages=max_pages)
+    
+    if not result["success"]:
+        error = result["error"]
+        if "exception" in result:
+            error = f"PDF extraction failed: {result['exception']}"
         return {
             "success": False,
-            "error": f"PDF extraction failed: {str(e)}",
+            "error": error,
             "text": "",
             "metadata": {}
         }
+    
+    # Keep this script's original response shape
+    return {
+        "success": True,
+        "text": result["text"],
+        "totalCharacters": result["totalCharacters"],
+        "metadata": {
+            "pageCount": result["metadata"]["pageCount"],
+            "fileSize": result["metadata"]["fileSize"],
+            "extractionMethod": "PyMuPDF-Python",
+            "extractionTime": "",  # Will be set by Node.js
+            "pages": [page["text"] for page in result["pages"]]
+        }
+    }
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
@@ -73,4 +48,6 @@ if __name__ == "__main__":
     
     pdf_path = sys.argv[1]
     result = extract_pdf_text(pdf_path)
-    print(json.dumps(result))
\ No newline at end of file
+    
+    # Output compact UTF-8 JSON as bytes, bypassing the console encoding
+    pdf_text.write_result(result)
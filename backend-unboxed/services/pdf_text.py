@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+PyMuPDF PDF Text Extraction
+Single extraction path shared by pymupdf_extractor.py, pdf_extractor.py
+and extract_pdf_text.py - each of those is a thin CLI over this module
+PyMuPDF (fitz) is imported on first use so usage/error paths stay fast
+"""
+
+import json
+import mmap
+import os
+import re
+import sys
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import orjson  # Optional: much faster JSON for large text payloads
+except ImportError:
+    orjson = None
+
+# Extraction modes:
+#   fast       - raw page text joined with newlines, no cleaning
+#   clean      - "=== PAGE n ===" banners, NFKC + punctuation folding
+#   structured - "--- Page n ---" headers, empty pages dropped,
+#                clean_unicode_text applied per page
+MODES = ("fast", "clean", "structured")
+
+def _fitz():
+    """Import PyMuPDF on first use"""
+    # PyMuPDF writes its messages to stdout by default (including the
+    # deprecation warning recent releases print on "import fitz"), which
+    # would corrupt the JSON the CLIs write there - send them to stderr
+    os.environ.setdefault("PYMUPDF_MESSAGE", "fd:2")
+    try:
+        import pymupdf
+        return pymupdf
+    except ImportError:
+        import fitz  # PyMuPDF < 1.24.3
+        return fitz
+
+def _text_flags():
+    """
+    Flags for page.get_text("text") - the same value PyMuPDF uses by default
+    ("text" mode never decodes images); passed explicitly only to pin it
+    """
+    return _fitz().TEXTFLAGS_TEXT
+
+# Replace problematic characters with similar ASCII equivalents
+_REPLACEMENTS = {
+    '\uf084': ' ',  # Private Use Area character
+    '\uf0b0': '°',  # Private Use Area character (degree-like)
+    '\u2019': "'",  # Right single quotation mark
+    '\u201c': '"',  # Left double quotation mark
+    '\u201d': '"',  # Right double quotation mark
+    '\u2013': '-',  # En dash
+    '\u2014': '-',  # Em dash
+    '\u03bc': 'µ',  # Greek mu (also NFKC's form of ㎍, ㎕, ...)
+    '\u2044': '/',  # Fraction slash (from NFKC of ½, ¼, ...)
+}
+
+# Fold typographic characters to ASCII; scientific symbols (°, µ, α, ...)
+# are kept and written as UTF-8
+_ASCII_FOLD = str.maketrans({**_REPLACEMENTS, '\u2018': "'"})  # + left single quote
+
+def _clean_char(char):
+    """Map a single character to its cleaned replacement"""
+    # Keep only printable ASCII and common extended characters
+    if ord(char) < 128:  # ASCII
+        return char
+    if 160 <= ord(char) < 256:  # Extended ASCII
+        return char
+    if unicodedata.category(char)[0] in ['L', 'N', 'P', 'S', 'Z']:  # Letters, Numbers, Punctuation, Symbols, Separators
+        # Try to normalize the character
+        normalized = unicodedata.normalize('NFKD', char)
+        if len(normalized) == 1 and ord(normalized) < 256:
+            return normalized
+        # Replace with closest ASCII equivalent
+        ascii_equiv = normalized.encode('ascii', 'ignore').decode('ascii')
+        return ascii_equiv if ascii_equiv else ' '
+    return ' '  # Replace control/format characters with space
+
+class _CleanTable(dict):
+    """str.translate table that fills in each code point on first lookup"""
+
+    def __missing__(self, codepoint):
+        value = _clean_char(chr(codepoint))
+        self[codepoint] = value
+        return value
+
+# Superscript digits and signs carry meaning in SDS text (mg/m³, 10⁻³)
+# and are kept as-is
+_SUPERSCRIPTS = '\u2070\u00b9\u00b2\u00b3\u2074\u2075\u2076\u2077\u2078\u2079\u207a\u207b'
+
+_CLEAN_TABLE = _CleanTable(str.maketrans(_REPLACEMENTS))
+
+# Characters that are never normalized or mapped: ASCII, Latin-1 and the
+# superscripts. NFKC would turn superscripts into plain digits ("m³" -> "m3"),
+# º/ª into letters ("23ºC" -> "23oC"), µ into Greek mu, ½ into "1⁄2" and the
+# spacing accents (´ ¨ ¯ ¸) into a space + combining mark; Latin-1 is kept
+# whole, as the cleaner always has. Only NBSP is left for NFKC to fold
+_KEEP = f"\x00-\x7f\u00a1-\u00ff{_SUPERSCRIPTS}"
+
+# Runs of every other character - the only text that needs work
+_NORMALIZE_RUNS = re.compile(f"[^{_KEEP}]+")
+
+class _NormalizedRuns(dict):
+    """Cache of normalized runs - the same few (quotes, dashes, ...) repeat on every page"""
+
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def __missing__(self, run):
+        # NFKC would decompose the ring above into a space + combining mark
+        normalized = run.replace('\u02da', '°') if '\u02da' in run else run
+        # Fold compatibility characters (ligatures, full-width forms, NBSP, ...)
+        value = unicodedata.normalize('NFKC', normalized).translate(self.table)
+        self[run] = value
+        return value
+
+def _normalize(text, table):
+    """
+    NFKC-normalize text and map it through a str.translate table
+    Only runs of characters outside _KEEP are touched: ASCII text is returned
+    as-is and mostly-Latin text costs an NFC quick check plus one regex scan
+    """
+    if text.isascii():
+        return text
+
+    # Compose combining marks with their base letter first ("e" + U+0301 ->
+    # "é"), since a run starts after the base. NFC leaves compatibility
+    # characters (º, ³, ½, ...) alone and is a quick check on composed text
+    text = unicodedata.normalize('NFC', text)
+    runs = _NormalizedRuns(table)
+    return _NORMALIZE_RUNS.sub(lambda match: runs[match.group()], text)
+
+def clean_unicode_text(text):
+    """Clean problematic Unicode characters from text"""
+    # Each distinct character is classified only once (see _CleanTable)
+    return _normalize(text, _CLEAN_TABLE)
+
+# PDFs up to this size are read into memory in one go and parsed from the
+# buffer; larger files are memory-mapped so the OS page cache serves
+# MuPDF's random-access reads without a second copy of the file
+STREAM_OPEN_MAX_BYTES = 50 * 1024 * 1024
+
+@contextmanager
+def _open_pdf(pdf_path, file_size=None):
+    """Open a PDF for the duration of a with-block"""
+    fitz = _fitz()
+
+    if file_size is None:
+        file_size = os.path.getsize(pdf_path)
+
+    if file_size <= STREAM_OPEN_MAX_BYTES:
+        with open(pdf_path, 'rb') as f:
+            doc = fitz.open(stream=f.read(), filetype="pdf")
+        try:
+            yield doc
+        finally:
+            doc.close()
+        return
+
+    with open(pdf_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        try:
+            doc = fitz.open(stream=view, filetype="pdf")
+        except TypeError:
+            # Older PyMuPDF only takes bytes streams; let MuPDF read the file
+            doc = fitz.open(pdf_path)
+        try:
+            yield doc
+        finally:
+            doc.close()
+    finally:
+        # The document must be closed before the mapping can be released
+        view.release()
+        mapped.close()
+
+# A page with less text than this, mostly covered by images, looks scanned
+MIN_TEXT_CHARS = 20
+MIN_IMAGE_COVERAGE = 0.5
+
+def _is_scanned_page(page):
+    """True when a page is mostly image with (almost) no text layer"""
+    fitz = _fitz()
+
+    # get_images() only reads the resource list, so text pages exit here
+    if not page.get_images():
+        return False
+
+    text = page.get_text("text", flags=_text_flags())
+    if len("".join(text.split())) >= MIN_TEXT_CHARS:
+        return False
+
+    page_area = abs(page.rect)
+    image_area = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return page_area > 0 and image_area >= MIN_IMAGE_COVERAGE * page_area
+
+def _is_scanned_pdf(doc):
+    """
+    Cheap probe for image-only PDFs that need OCR: the first, middle and
+    last pages must all look scanned, so a scanned cover or back page around
+    real text pages doesn't hide the text
+    """
+    if doc.page_count == 0:
+        return False
+
+    # The first page decides for text PDFs; the others are only read when it looks scanned
+    probe_pages = sorted({0, doc.page_count // 2, doc.page_count - 1})
+    return all(_is_scanned_page(doc[page_num]) for page_num in probe_pages)
+
+# Documents with at least this many pages are split across worker
+# processes; below that, process start-up costs more than it saves
+PARALLEL_PAGE_THRESHOLD = 32
+MAX_WORKERS = 4
+
+def _extract_page_range(pdf_path, start, end):
+    """Extract raw text for pages [start, end) - runs in a worker process"""
+    # fitz Documents can't be shared between processes, so open our own
+    flags = _text_flags()
+    with _open_pdf(pdf_path) as doc:
+        return [(page_num, page.get_text("text", flags=flags)) for page_num, page in enumerate(doc.pages(start, end), start)]
+
+def _extract_page_texts(doc, pdf_path, max_pages=None, parallel=True):
+    """Return the raw text of every page (up to max_pages) in page order"""
+    page_count = doc.page_count
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    num_workers = min(os.cpu_count() or 1, MAX_WORKERS)
+
+    if not parallel or num_workers < 2 or page_count < PARALLEL_PAGE_THRESHOLD:
+        flags = _text_flags()
+        page_texts = []
+        for page_num, page in enumerate(doc):
+            if page_num >= page_count:
+                break
+            page_texts.append(page.get_text("text", flags=flags))
+        return page_texts
+
+    # Hand each worker a contiguous page range and reassemble in order
+    chunk_size = -(-page_count // num_workers)
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        futures = [
+            pool.submit(_extract_page_range, pdf_path, start, min(start + chunk_size, page_count))
+            for start in range(0, page_count, chunk_size)
+        ]
+        results = [item for future in futures for item in future.result()]
+
+    results.sort(key=lambda item: item[0])
+    return [page_text for _, page_text in results]
+
+def _join_pages(page_texts, mode):
+    """Combine raw page texts into the final document text for a mode"""
+    if mode == "fast":
+        return "\n".join(page_texts).strip()
+
+    if mode == "structured":
+        # Clean each non-empty page and separate pages clearly
+        return "\n\n".join(
+            f"--- Page {page_num + 1} ---\n{clean_unicode_text(text)}"
+            for page_num, text in enumerate(page_texts)
+            if text.strip()
+        )
+
+    # clean: banner every page, then normalize and fold in one go
+    full_text = "".join(
+        f"\n=== PAGE {page_num + 1} ===\n{text}\n"
+        for page_num, text in enumerate(page_texts)
+    )
+    return _normalize(full_text.strip(), _ASCII_FOLD)
+
+def extract_text_from_pdf(pdf_path, *, mode="clean", keep_pages=False, max_pages=None, parallel=True):
+    """
+    Extract text from PDF using PyMuPDF
+    Returns structured data for SDS analysis
+    mode selects the text layout and cleaning (see MODES)
+    Per-page raw text is only returned in "pages" when keep_pages is set
+    Only the first max_pages pages are read when max_pages is given
+    parallel=False keeps large documents in this process instead of a
+    worker pool (for callers that already run one process per CPU)
+    On an unexpected exception "exception" holds its message (also in "error")
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown extraction mode: {mode}")
+
+    try:
+        # Validate file exists (and keep the stat for the file size)
+        try:
+            file_stat = os.stat(pdf_path)
+        except FileNotFoundError:
+            return {
+                "success": False,
+                "error": f"File not found: {pdf_path}",
+                "text": "",
+                "metadata": {},
+                "pages": []
+            }
+
+        # Open PDF document
+        with _open_pdf(pdf_path, file_stat.st_size) as doc:
+            # Don't walk every page of a scanned PDF just to get empty text
+            if _is_scanned_pdf(doc):
+                return {
+                    "success": False,
+                    "error": "scanned_pdf_needs_ocr",
+                    "text": "",
+                    "metadata": {},
+                    "pages": []
+                }
+
+            # Extract metadata (read doc.metadata once)
+            md = doc.metadata or {}
+            metadata = {
+                "title": md.get("title", ""),
+                "author": md.get("author", ""),
+                "subject": md.get("subject", ""),
+                "creator": md.get("creator", ""),
+                "producer": md.get("producer", ""),
+                "creationDate": md.get("creationDate", ""),
+                "modDate": md.get("modDate", ""),
+                "pageCount": doc.page_count,
+                "fileSize": file_stat.st_size,
+                "extractionMethod": "PyMuPDF",
+                "extractionTime": datetime.now().isoformat()
+            }
+
+            page_texts = _extract_page_texts(doc, pdf_path, max_pages, parallel)
+
+        text = _join_pages(page_texts, mode)
+
+        # Store individual page text for debugging
+        pages = []
+        if keep_pages:
+            pages = [
+                {"pageNumber": page_num + 1, "text": page_text, "charCount": len(page_text)}
+                for page_num, page_text in enumerate(page_texts)
+            ]
+
+        return {
+            "success": True,
+            "error": None,
+            "text": text,
+            "metadata": metadata,
+            "pages": pages,
+            "totalCharacters": len(text),
+            "processingTime": "local"
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "exception": str(e),
+            "text": "",
+            "metadata": {},
+            "pages": []
+        }
+
+def _dumps(obj):
+    """Serialize a result as compact UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def write_result(result):
+    """Write one JSON result line straight to the stdout byte stream"""
+    sys.stdout.buffer.write(_dumps(result))
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
@@ -7,109 +7,76 @@ No external dependencies, no API calls, just pure text extraction
 
 import sys
 import json
-import fitz  # PyMuPDF
-import os
-from datetime import datetime
+import pdf_text
 
-def extract_text_from_pdf(pdf_path):
+def extract_text_from_pdf(pdf_path, max_pages=None, keep_pages=False, parallel=True):
     """
     Extract clean text from PDF using PyMuPDF
-    Returns structured data for SDS analysis
+    Returns structured data for SDS analysis (see pdf_text.extract_text_from_pdf)
     """
-    try:
-        # Validate file exists
-        if not os.path.exists(pdf_path):
-            return {
-                "success": False,
-                "error": f"File not found: {pdf_path}",
-                "text": "",
-                "metadata": {}
-            }
-        
-        # Open PDF document
-        doc = fitz.open(pdf_path)
-        
-        # Extract metadata
-        metadata = {
-            "title": doc.metadata.get("title", ""),
-            "author": doc.metadata.get("author", ""),
-            "subject": doc.metadata.get("subject", ""),
-            "creator": doc.metadata.get("creator", ""),
-            "producer": doc.metadata.get("producer", ""),
-            "creationDate": doc.metadata.get("creationDate", ""),
-            "modDate": doc.metadata.get("modDate", ""),
-            "pageCount": doc.page_count,
-            "extractionMethod": "PyMuPDF",
-            "extractionTime": datetime.now().isoformat()
-        }
-        
-        # Extract text from all pages
-        full_text = ""
-        page_texts = []
-        
-        for page_num in range(doc.page_count):
-            page = doc[page_num]
-            
-            # Get text with layout preservation
-            page_text = page.get_text()
-            
-            # Store individual page text for debugging
-            page_texts.append({
-                "pageNumber": page_num + 1,
-                "text": page_text,
-                "charCount": len(page_text)
-            })
-            
-            # Combine all text
-            full_text += f"\n=== PAGE {page_num + 1} ===\n"
-            full_text += page_text
-            full_text += "\n"
-        
-        # Close document
-        doc.close()
-        
-        # Clean up text and handle Unicode issues
-        clean_text = full_text.strip()
+    return pdf_text.extract_text_from_pdf(pdf_path, mode="clean", keep_pages=keep_pages, max_pages=max_pages, parallel=parallel)
+
+def serve(keep_pages=False):
+    """
+    Persistent worker mode: read one request per line from stdin and
+    write one JSON result per line to stdout, so interpreter and PyMuPDF
+    start-up is paid once per worker instead of once per PDF
+    A request is a bare PDF path or {"id": ..., "path": ...}; the path and
+    id are echoed in the result so callers can match results to requests
+    """
+    sys.stdin.reconfigure(encoding='utf-8')
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
         
-        # Remove problematic Unicode characters that cause Windows encoding issues
-        clean_text = clean_text.encode('ascii', 'ignore').decode('ascii')
+        try:
+            request = json.loads(line) if line.startswith("{") else {"path": line}
+        except ValueError as e:
+            pdf_text.write_result({"success": False, "error": f"Invalid request: {e}"})
+            continue
         
-        return {
-            "success": True,
-            "error": None,
-            "text": clean_text,
-            "metadata": metadata,
-            "pages": page_texts,
-            "totalCharacters": len(clean_text),
-            "processingTime": "local"
-        }
+        # Echo the id even for a bad request so the caller isn't left waiting
+        pdf_path = request.get("path")
+        if not isinstance(pdf_path, str):
+            pdf_text.write_result({"success": False, "error": 'Invalid request: missing "path"', "id": request.get("id")})
+            continue
         
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "text": "",
-            "metadata": {},
-            "pages": []
-        }
+        # The caller runs one worker per CPU, so don't fan out per document
+        result = extract_text_from_pdf(pdf_path, keep_pages=keep_pages, parallel=False)
+        result["path"] = pdf_path
+        if "id" in request:
+            result["id"] = request["id"]
+        pdf_text.write_result(result)
 
 def main():
     """
     Main function for command line usage
-    Usage: python pymupdf_extractor.py <pdf_path>
+    Usage: python pymupdf_extractor.py <pdf_path> [--debug]
+           python pymupdf_extractor.py --server [--debug]
+    --debug includes the per-page text in "pages"
+    --server reads requests from stdin and writes one JSON line per request
     """
-    if len(sys.argv) < 2:
+    args = [arg for arg in sys.argv[1:] if arg != "--debug"]
+    debug = len(args) < len(sys.argv) - 1
+    
+    if not args:
         print(json.dumps({
             "success": False,
-            "error": "Usage: python pymupdf_extractor.py <pdf_path>"
+            "error": "Usage: python pymupdf_extractor.py <pdf_path> [--debug] | --server [--debug]"
         }))
         sys.exit(1)
     
-    pdf_path = sys.argv[1]
-    result = extract_text_from_pdf(pdf_path)
+    if args[0] == "--server":
+        serve(keep_pages=debug)
+        return
+    
+    pdf_path = args[0]
+    result = extract_text_from_pdf(pdf_path, keep_pages=debug)
     
-    # Output JSON result with ASCII encoding for Windows compatibility
-    print(json.dumps(result, indent=2, ensure_ascii=True))
+    # Output compact UTF-8 JSON as bytes, bypassing the console encoding
+    pdf_text.write_result(result)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
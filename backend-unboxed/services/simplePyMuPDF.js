@@ -1,15 +1,169 @@
 // Simplified PyMuPDF Service - Direct approach for Windows compatibility
 import fs from 'fs';
+import os from 'os';
 import path from 'path';
-import { execSync } from 'child_process';
+import readline from 'readline';
+import { execSync, spawn } from 'child_process';
+
+const WORKER_TIMEOUT_MS = 30000; // 30 second timeout per PDF
 
 class SimplePyMuPDFService {
   constructor() {
+    this.workers = [];
+    this.nextWorker = 0;
+    this.nextRequestId = 0;
     console.log('🐍 Simple PyMuPDF Service initialized');
   }
 
   /**
-   * Extract text from PDF using direct execSync approach
+   * Start a long-lived `pymupdf_extractor.py --server` process.
+   * Each result line echoes its request id and is matched on that, so a
+   * stray stdout line can't shift results onto the wrong PDF.
+   */
+  startWorker(scriptPath) {
+    const python = spawn('python', [scriptPath, '--server'], {
+      // PyMuPDF messages go to stderr so stdout only carries result lines
+      env: { ...process.env, PYMUPDF_MESSAGE: 'fd:2' }
+    });
+    // pending is in request order; the worker handles requests one at a
+    // time, so its first entry is the one currently being extracted
+    const worker = { process: python, pending: new Map(), timer: null, timedOut: false, retired: false };
+
+    python.stdout.setEncoding('utf8');
+    readline.createInterface({ input: python.stdout }).on('line', (line) => {
+      let result;
+      try {
+        result = JSON.parse(line);
+      } catch (error) {
+        console.warn(`⚠️ PyMuPDF worker stdout: ${line}`);
+        return;
+      }
+
+      const request = worker.pending.get(result.id);
+      if (!request) {
+        console.warn(`⚠️ PyMuPDF worker returned an unknown request id: ${result.id}`);
+        return;
+      }
+      const wasCurrent = worker.pending.keys().next().value === result.id;
+      worker.pending.delete(result.id);
+      delete result.id;
+      request.resolve(result);
+      if (wasCurrent) this.armTimer(worker);
+    });
+
+    python.stderr.on('data', (data) => {
+      console.warn(`⚠️ PyMuPDF worker: ${data.toString().trim()}`);
+    });
+
+    // Drop the worker (getWorker starts a replacement). Only the request it
+    // was working on fails; the ones queued behind it go to other workers.
+    const retire = (reason) => {
+      if (worker.retired) return;
+      worker.retired = true;
+      clearTimeout(worker.timer);
+      this.workers = this.workers.filter((w) => w !== worker);
+
+      const [current, ...waiting] = worker.pending.values();
+      worker.pending.clear();
+      if (current) {
+        current.reject(new Error(worker.timedOut
+          ? `PDF extraction timed out after ${WORKER_TIMEOUT_MS / 1000}s`
+          : reason));
+      }
+      for (const request of waiting) {
+        this.dispatch(scriptPath, request);
+      }
+    };
+    python.on('exit', (code) => retire(`PyMuPDF worker exited with code ${code}`));
+    python.on('error', (error) => retire(`PyMuPDF worker failed: ${error.message}`));
+    python.stdin.on('error', () => {}); // reported through 'exit'
+
+    this.holdEventLoop(worker, false);
+    return worker;
+  }
+
+  /**
+   * Only keep Node running for a worker while it has requests, so a script
+   * that extracts a PDF can exit without calling shutdown()
+   */
+  holdEventLoop(worker, hold) {
+    const method = hold ? 'ref' : 'unref';
+    for (const handle of [worker.process, worker.process.stdin, worker.process.stdout, worker.process.stderr]) {
+      handle[method]();
+    }
+  }
+
+  /**
+   * Start the timeout for the request a worker is currently extracting.
+   * Requests still waiting in its queue don't use up their time.
+   */
+  armTimer(worker) {
+    clearTimeout(worker.timer);
+    worker.timer = null;
+    this.holdEventLoop(worker, worker.pending.size > 0);
+    if (worker.pending.size === 0) return;
+
+    // A hung extraction kills the worker; retire() then fails only that request
+    worker.timer = setTimeout(() => {
+      worker.timedOut = true;
+      worker.process.kill();
+    }, WORKER_TIMEOUT_MS);
+  }
+
+  /**
+   * Pick the next worker round-robin, topping the pool back up to one
+   * worker per CPU if any have died
+   */
+  getWorker(scriptPath) {
+    const count = Math.max(1, os.cpus().length);
+    let started = 0;
+    while (this.workers.length < count) {
+      this.workers.push(this.startWorker(scriptPath));
+      started++;
+    }
+    if (started > 0) {
+      console.log(`🐍 Started ${started} PyMuPDF worker(s)`);
+    }
+    return this.workers[this.nextWorker++ % this.workers.length];
+  }
+
+  /**
+   * Queue a request on a worker
+   */
+  dispatch(scriptPath, request) {
+    const worker = this.getWorker(scriptPath);
+    worker.pending.set(request.id, request);
+    if (worker.pending.size === 1) this.armTimer(worker);
+    worker.process.stdin.write(`${JSON.stringify({ id: request.id, path: request.pdfPath })}\n`);
+  }
+
+  /**
+   * Send one PDF path to a persistent worker and wait for its JSON result
+   */
+  runWorker(scriptPath, pdfPath) {
+    return new Promise((resolve, reject) => {
+      this.dispatch(scriptPath, { id: this.nextRequestId++, pdfPath, resolve, reject });
+    });
+  }
+
+  /**
+   * Stop all persistent workers (lets the Node process exit)
+   */
+  shutdown() {
+    for (const worker of this.workers) {
+      worker.retired = true;
+      clearTimeout(worker.timer);
+      for (const request of worker.pending.values()) {
+        request.reject(new Error('PyMuPDF service shut down'));
+      }
+      worker.pending.clear();
+      worker.process.stdin.end();
+    }
+    this.workers = [];
+  }
+
+  /**
+   * Extract text from PDF using a persistent PyMuPDF worker
    */
   async extractText(pdfPath) {
     try {
@@ -20,7 +174,7 @@ class SimplePyMuPDFService {
         throw new Error(`PDF file not found: ${pdfPath}`);
       }
 
-      // Use execSync for more reliable Windows execution  
+      // Resolve the worker script next to this file
       const __filename = import.meta.url.replace('file:///', '');
       const __dirname = path.dirname(__filename);
       const scriptPath = path.join(__dirname, 'pymupdf_extractor.py');
@@ -30,20 +184,8 @@ class SimplePyMuPDFService {
       console.log(`📄 Script: ${absoluteScriptPath}`);
       console.log(`📄 PDF: ${absolutePdfPath}`);
       
-      // Execute Python script synchronously
-      const command = `python "${absoluteScriptPath}" "${absolutePdfPath}"`;
-      console.log(`🐍 Executing: ${command}`);
-      
-      const output = execSync(command, { 
-        encoding: 'utf8',
-        timeout: 30000, // 30 second timeout
-        maxBuffer: 10 * 1024 * 1024 // 10MB buffer
-      });
-      
-      console.log(`✅ Python execution successful, output length: ${output.length}`);
-      
-      // Parse JSON response
-      const result = JSON.parse(output);
+      // Hand the PDF to a persistent Python worker
+      const result = await this.runWorker(absoluteScriptPath, absolutePdfPath);
       
       if (result.success) {
         console.log(`✅ PyMuPDF extraction successful: ${result.totalCharacters} chars from ${result.metadata.pageCount} pages`);
@@ -1,17 +1,25 @@
 #!/usr/bin/env python3
-import fitz
 import sys
 
-print("Testing PyMuPDF installation...")
+def main():
+    print("Testing PyMuPDF installation...")
 
-try:
-    # Test basic import
-    print(f"PyMuPDF version: {fitz.VersionBind}")
-    print("[OK] PyMuPDF imported successfully")
-    
-    # Test basic functionality
-    print("[OK] PyMuPDF is ready for PDF processing")
-    
-except Exception as e:
-    print(f"[FAIL] PyMuPDF test failed: {e}")
-    sys.exit(1)
\ No newline at end of file
+    try:
+        # Test basic import ("import fitz" prints a deprecation warning on
+        # recent PyMuPDF, so only fall back to it on old releases)
+        try:
+            import pymupdf as fitz
+        except ImportError:
+            import fitz  # PyMuPDF < 1.24.3
+        print(f"PyMuPDF version: {fitz.VersionBind}")
+        print("[OK] PyMuPDF imported successfully")
+
+        # Test basic functionality
+        print("[OK] PyMuPDF is ready for PDF processing")
+
+    except Exception as e:
+        print(f"[FAIL] PyMuPDF test failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services'))
+
+import pdf_text
+
+# (input, clean_unicode_text output) - SDS notation the cleaner must keep
+CASES = [
+    # Superscripts
+    ("10³ mg/m³", "10³ mg/m³"),
+    ("1 × 10⁻⁵ cm²/s", "1 × 10⁻⁵ cm²/s"),
+    # Latin-1 characters NFKC would rewrite
+    ("Flash point: 23ºC", "Flash point: 23ºC"),
+    ("1ª", "1ª"),
+    ("´ ¨ ¯ ¸", "´ ¨ ¯ ¸"),
+    ("5 µg, ½ tsp", "5 µg, ½ tsp"),
+    # Characters that are still folded
+    ("25˚C", "25°C"),
+    ("10\u00a0mg", "10 mg"),  # NBSP
+    ("ﬁll “point” – μg", "fill \"point\" - µg"),
+]
+
+def main():
+    print("Testing PDF text cleaning...")
+
+    failed = 0
+    for text, expected in CASES:
+        cleaned = pdf_text.clean_unicode_text(text)
+        if cleaned == expected:
+            print(f"[OK] {text!r}")
+        else:
+            print(f"[FAIL] {text!r}: got {cleaned!r}, expected {expected!r}")
+            failed += 1
+
+    if failed:
+        print(f"[FAIL] {failed} of {len(CASES)} cleaning checks failed")
+        sys.exit(1)
+    print("[OK] Text cleaning keeps SDS notation")
+
+if __name__ == "__main__":
+    main()
@@ -2,86 +2,31 @@
 """
 PDF Text Extraction Script for Revolutionary Classifier
 Extracts complete text from PDF while preserving sections structure
+
+Depends on backend-unboxed/services/pdf_text.py (run by text-based-server.js
+on every upload): deploy that module with this script, either in
+backend-unboxed/services, next to this file or on PYTHONPATH
 """
 
+import os
 import sys
-import fitz  # PyMuPDF
-import unicodedata
-import re
 
-def clean_unicode_text(text):
-    """Clean problematic Unicode characters from text"""
-    # Replace problematic characters with similar ASCII equivalents
-    replacements = {
-        '\uf084': ' ',  # Private Use Area character
-        '\u02da': '°',  # Ring above (degree)
-        '\uf0b0': '°',  # Private Use Area character (degree-like)
-        '\u2019': "'",  # Right single quotation mark
-        '\u201c': '"',  # Left double quotation mark
-        '\u201d': '"',  # Right double quotation mark
-        '\u2013': '-',  # En dash
-        '\u2014': '-',  # Em dash
-        '\u00a0': ' ',  # Non-breaking space
-    }
-    
-    # Replace known problematic characters
-    for old_char, new_char in replacements.items():
-        text = text.replace(old_char, new_char)
-    
-    # Remove or replace other problematic Unicode characters
-    # Keep only printable ASCII and common extended characters
-    cleaned_chars = []
-    for char in text:
-        if ord(char) < 128:  # ASCII
-            cleaned_chars.append(char)
-        elif ord(char) in range(160, 256):  # Extended ASCII
-            cleaned_chars.append(char)
-        elif unicodedata.category(char)[0] in ['L', 'N', 'P', 'S', 'Z']:  # Letters, Numbers, Punctuation, Symbols, Separators
-            try:
-                # Try to normalize the character
-                normalized = unicodedata.normalize('NFKD', char)
-                if len(normalized) == 1 and ord(normalized) < 256:
-                    cleaned_chars.append(normalized)
-                else:
-                    # Replace with closest ASCII equivalent
-                    ascii_equiv = unicodedata.normalize('NFKD', char).encode('ascii', 'ignore').decode('ascii')
-                    cleaned_chars.append(ascii_equiv if ascii_equiv else ' ')
-            except:
-                cleaned_chars.append(' ')  # Replace with space if all else fails
-        else:
-            cleaned_chars.append(' ')  # Replace control/format characters with space
-    
-    return ''.join(cleaned_chars)
+try:
+    import pdf_text  # next to this script or on PYTHONPATH
+except ImportError:
+    # Repo layout: the extraction code lives with the other PyMuPDF services
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend-unboxed', 'services'))
+    import pdf_text
 
-def extract_pdf_text(pdf_path):
-    """Extract text from PDF preserving section structure"""
-    try:
-        # Open the PDF
-        doc = fitz.open(pdf_path)
-        
-        text_parts = []
-        
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            
-            # Extract text with layout preservation
-            text = page.get_text("text")  # Preserves line breaks and formatting
-            
-            if text.strip():
-                # Clean Unicode characters that cause encoding issues
-                cleaned_text = clean_unicode_text(text)
-                text_parts.append(f"--- Page {page_num + 1} ---\n{cleaned_text}")
-        
-        doc.close()
-        
-        # Combine all pages with clear separation
-        full_text = "\n\n".join(text_parts)
-        
-        return full_text
-        
-    except Exception as e:
-        print(f"Error extracting PDF: {str(e)}", file=sys.stderr)
+def extract_pdf_text(pdf_path, max_pages=None):
+    """Extract text from PDF preserving section structure, optionally only the first max_pages pages"""
+    result = pdf_text.extract_text_from_pdf(pdf_path, mode="structured", max_pages=max_pages)
+    
+    if not result["success"]:
+        print(f"Error extracting PDF: {result['error']}", file=sys.stderr)
         return ""
+    
+    return result["text"]
 
 if __name__ == "__main__":
     if len(sys.argv) != 2: